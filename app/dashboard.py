@@ -1,13 +1,21 @@
 # app/dashboard.py
+import asyncio
+import hashlib
 import os
+import signal
+import threading
 from datetime import datetime
-from typing import Any, Dict, List
+from collections import OrderedDict
+from typing import Annotated, Any, Dict, List, Optional, Set, Tuple
 
+import numpy as np
+import orjson
 from dotenv import load_dotenv
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 
-from .storage import PREDICTION_HISTORY
+from .storage import MAX_HISTORY, get_history_snapshot, get_oldest_timestamp
 
 router = APIRouter()
 
@@ -18,12 +26,83 @@ REFRESH_INTERVAL_SEC = int(os.getenv("DASHBOARD_REFRESH_INTERVAL", "30"))
 RECENT_WINDOW_DEFAULT = 10
 STREAK_N = 3
 
+# 차트 포인트가 이 개수를 넘으면 LTTB로 다운샘플링해서 전송 (KPI 계산에는 영향 없음)
+DOWNSAMPLE_THRESHOLD = 2000
+DOWNSAMPLE_N_OUT = 1500
+# 최근 포인트는 집계하지 않고 원본 그대로 보냄
+DOWNSAMPLE_KEEP_RAW = max(RECENT_WINDOW_DEFAULT, STREAK_N)
+
+# SSE 연결 유지용 주석 이벤트 간격(초) – ALB idle timeout(기본 60초)보다 짧게
+SSE_KEEPALIVE_SEC = 15
+# 연결이 끊겼을 때 브라우저의 재연결 대기 시간(ms)
+SSE_RETRY_MS = 5000
+# 구독자별 대기 이벤트 최대 개수 (넘치면 밀린 포인트를 버리고 resync 이벤트로 다시 조회하게 함)
+SSE_QUEUE_SIZE = 16
+# SSE가 연결되어 있는 동안의 polling 주기(초).
+# 새 포인트는 push로 바로 반영하므로, 다른 워커에서 처리된 예측을 가끔 따라잡는 용도로만 길게 둠
+STREAM_POLL_INTERVAL_SEC = REFRESH_INTERVAL_SEC * 10
+
+# /dashboard/stream 구독자: (구독자의 이벤트 루프, 이벤트 큐)
+# 큐 원소: 포인트 JSON, 또는 큐가 넘쳐서 다시 조회가 필요하다는 표시(None)
+_SUBSCRIBERS: Set[Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[Optional[bytes]]"]] = set()
+_SUBSCRIBERS_LOCK = threading.Lock()
+# 서버 종료 신호를 받으면 set -> 열린 스트림을 모두 끝냄 (install_stream_shutdown_hook 참고)
+_STREAM_STOP = asyncio.Event()
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링.
+    시계열 모양(피크 등)을 최대한 보존하는 n_out개 포인트의 인덱스를 반환한다.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 첫/마지막 포인트는 고정, 나머지를 n_out - 2개 버킷으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 다음 버킷의 평균점 (마지막 버킷이면 마지막 포인트)
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+
+        # 이전 선택점 a, 다음 버킷 평균점과 만드는 삼각형 넓이가 최대인 포인트 선택
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+
+    return out
+
 
-def _build_dashboard_metrics() -> Dict[str, Any]:
-    """PREDICTION_HISTORY를 기반으로 차트/지표 계산."""
-    if not PREDICTION_HISTORY:
+def _to_epoch_ms(ts: datetime) -> int:
+    return int(ts.timestamp() * 1000)
+
+
+def _build_dashboard_metrics(
+    history: List[Dict[str, Any]], since: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    히스토리 스냅샷(get_history_snapshot 결과)을 기반으로 차트/지표 계산.
+
+    since(Unix epoch ms)가 주어지면 차트 데이터(timestamps/prob_ng_percent/marker_colors)는
+    since 이후에 추가된 포인트만 담는다. KPI는 항상 전체 히스토리 기준.
+    시각은 모두 Unix epoch ms 정수로 내려보낸다 (문자열보다 직렬화/파싱이 빠름).
+    """
+    if not history:
         return {
             "has_data": False,
+            "incremental": since is not None,
+            "max_points": MAX_HISTORY,
+            "range_start": None,
             "timestamps": [],
             "prob_ng_percent": [],
             "threshold_percent": THRESHOLD * 100,
@@ -33,50 +112,70 @@ def _build_dashboard_metrics() -> Dict[str, Any]:
             "streak_ng": None,
         }
 
-    timestamps: List[datetime] = [rec["timestamp"] for rec in PREDICTION_HISTORY]
-    prob_ng_raw: List[float] = [float(rec["prob_ng"]) for rec in PREDICTION_HISTORY]
+    n_points = len(history)
+    timestamps_ms = np.fromiter(
+        (_to_epoch_ms(rec["timestamp"]) for rec in history), dtype=np.int64, count=n_points
+    )
+    prob_ng_raw = np.fromiter(
+        (rec["prob_ng"] for rec in history), dtype=np.float64, count=n_points
+    )
 
-    prob_ng_percent: List[float] = [p * 100.0 for p in prob_ng_raw]
+    # 이후 계산은 모두 NumPy 배열 연산 (원소별 파이썬 루프 없음)
+    prob_ng_percent = prob_ng_raw * 100.0
     threshold_percent: float = THRESHOLD * 100.0
 
     # NG 여부 및 색상
-    is_ng_list: List[bool] = [p >= threshold_percent for p in prob_ng_percent]
-    marker_colors: List[str] = ["#e74c3c" if flag else "#2980b9" for flag in is_ng_list]
+    is_ng = prob_ng_percent >= threshold_percent
+    marker_colors = np.where(is_ng, "#e74c3c", "#2980b9")
 
     # 마지막 값
-    last_prob = prob_ng_raw[-1]
-    last_prob_percent = prob_ng_percent[-1]
-    last_ts = timestamps[-1]
+    last_prob = float(prob_ng_raw[-1])
+    last_prob_percent = float(prob_ng_percent[-1])
+    last_ts = int(timestamps_ms[-1])
 
     status_label = "NG" if last_prob >= THRESHOLD else "OK"
 
     # 최근 N개 평균 (기본값 10개)
-    window = min(RECENT_WINDOW_DEFAULT, len(prob_ng_percent))
-    recent_slice = prob_ng_percent[-window:]
-    avg_prob_percent = sum(recent_slice) / window
-    ng_count_recent = sum(1 for p in recent_slice if p >= threshold_percent)
+    window = min(RECENT_WINDOW_DEFAULT, n_points)
+    avg_prob_percent = float(prob_ng_percent[-window:].mean())
+    ng_count_recent = int(is_ng[-window:].sum())
     ng_ratio_recent = (ng_count_recent / window) * 100.0 if window > 0 else 0.0
 
     # 연속 NG 경고 정보
     streak_info = None
-    if len(is_ng_list) >= STREAK_N:
-        recent_flags = is_ng_list[-STREAK_N:]
-        if all(recent_flags):
-            streak_info = {
-                "streak_n": STREAK_N,
-                "is_streak": True,
-            }
+    if n_points >= STREAK_N and is_ng[-STREAK_N:].all():
+        streak_info = {
+            "streak_n": STREAK_N,
+            "is_streak": True,
+        }
+
+    # 차트용 포인트: since 이후 것만 (timestamp는 오름차순이므로 이진 탐색)
+    start = 0
+    if since is not None:
+        start = int(np.searchsorted(timestamps_ms, since, side="right"))
+    chart_idx = np.arange(start, n_points)
+
+    # 포인트가 너무 많으면 최근 DOWNSAMPLE_KEEP_RAW개를 제외한 앞부분만 LTTB로 축소
+    if len(chart_idx) > DOWNSAMPLE_THRESHOLD:
+        head_end = n_points - DOWNSAMPLE_KEEP_RAW
+        head_x = timestamps_ms[start:head_end].astype(np.float64)
+        head_y = prob_ng_percent[start:head_end]
+        head_idx = _lttb_indices(head_x, head_y, DOWNSAMPLE_N_OUT - DOWNSAMPLE_KEEP_RAW) + start
+        chart_idx = np.concatenate([head_idx, np.arange(head_end, n_points)])
 
     return {
         "has_data": True,
-        "timestamps": [ts.isoformat() for ts in timestamps],
-        "prob_ng_percent": prob_ng_percent,
+        "incremental": since is not None,
+        "max_points": MAX_HISTORY,
+        "range_start": int(timestamps_ms[0]),
+        "timestamps": timestamps_ms[chart_idx].tolist(),
+        "prob_ng_percent": prob_ng_percent[chart_idx].tolist(),
         "threshold_percent": threshold_percent,
-        "marker_colors": marker_colors,
+        "marker_colors": marker_colors[chart_idx].tolist(),
         "last": {
             "prob_percent": last_prob_percent,
             "status_label": status_label,
-            "timestamp": last_ts.isoformat(),
+            "timestamp": last_ts,
         },
         "recent": {
             "window": window,
@@ -88,29 +187,195 @@ def _build_dashboard_metrics() -> Dict[str, Any]:
     }
 
 
+def _offer_event(queue: "asyncio.Queue[Optional[bytes]]", data: bytes) -> None:
+    try:
+        queue.put_nowait(data)
+    except asyncio.QueueFull:
+        # 느린 클라이언트: 밀린 포인트를 버리고 /dashboard/data?since=... 로 따라잡도록 알림
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+
+def publish_prediction(record: Dict[str, Any]) -> None:
+    """
+    새 예측 포인트를 /dashboard/stream 구독자에게 push.
+    /predict 백그라운드 작업(스레드풀)에서 호출되므로 call_soon_threadsafe로 각 루프에 전달한다.
+    프런트는 이 값만으로 차트/KPI를 갱신하므로 /dashboard/data를 다시 조회하지 않는다.
+    (range_start: 히스토리에서 밀려난 포인트를 차트에서 잘라내는 기준 시각)
+    """
+    with _SUBSCRIBERS_LOCK:
+        subscribers = list(_SUBSCRIBERS)
+    if not subscribers:
+        return
+    range_start = get_oldest_timestamp() or record["timestamp"]
+    data = orjson.dumps({
+        "timestamp": _to_epoch_ms(record["timestamp"]),
+        "prob_ng": record["prob_ng"],
+        "range_start": _to_epoch_ms(range_start),
+    })
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(_offer_event, queue, data)
+        except RuntimeError:
+            # 워커 종료 등으로 루프가 이미 닫힌 경우
+            pass
+
+
+def _history_state(history: List[Dict[str, Any]]) -> Tuple[int, Optional[str]]:
+    """히스토리 스냅샷의 상태 키 (길이 + 마지막 timestamp). 캐시 키와 ETag 계산에 사용."""
+    if not history:
+        return (0, None)
+    return (len(history), history[-1]["timestamp"].isoformat())
+
+
+# (상태 키, since) -> 지표 계산 결과. 스냅샷을 인자로 넘겨야 해서 lru_cache 대신 직접 관리
+_METRICS_CACHE: "OrderedDict[Tuple[Tuple[int, Optional[str]], Optional[int]], Dict[str, Any]]" = OrderedDict()
+_METRICS_CACHE_SIZE = 32
+_METRICS_CACHE_LOCK = threading.Lock()
+
+
+def _cached_dashboard_metrics(
+    history: List[Dict[str, Any]], state: Tuple[int, Optional[str]], since: Optional[int]
+) -> Dict[str, Any]:
+    """
+    히스토리 상태(와 since)가 같으면 지표 계산 결과도 같으므로 상태 키 기준으로 캐시한다.
+    (대시보드를 보는 브라우저 수와 상관없이 상태당 1회만 계산)
+    state는 반드시 같은 history 스냅샷에서 계산한 값이어야 한다 (캐시 키와 본문이 어긋나지 않도록).
+    """
+    key = (state, since)
+    with _METRICS_CACHE_LOCK:
+        cached = _METRICS_CACHE.get(key)
+        if cached is not None:
+            _METRICS_CACHE.move_to_end(key)
+            return cached
+
+    metrics = _build_dashboard_metrics(history, since)
+    with _METRICS_CACHE_LOCK:
+        _METRICS_CACHE[key] = metrics
+        if len(_METRICS_CACHE) > _METRICS_CACHE_SIZE:
+            _METRICS_CACHE.popitem(last=False)
+    return metrics
+
+
+def _make_etag(state: Tuple[int, Optional[str]], since: Optional[int]) -> str:
+    key = f"{state[0]}:{state[1]}:{since if since is not None else ''}"
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
 @router.get("/dashboard/data")
-async def get_dashboard_data() -> Dict[str, Any]:
+async def get_dashboard_data(
+    request: Request,
+    since: Annotated[Optional[int], Query(description="마지막으로 받은 포인트의 timestamp (Unix epoch ms)")] = None,
+) -> Response:
     """
     대시보드에 필요한 데이터를 JSON 형태로 반환.
     프런트에서는 이 데이터를 사용해서 KPI와 Plotly 그래프를 갱신한다.
+    since를 넘기면 그 이후의 새 포인트만 보내므로, 프런트는 extendTraces로 이어 붙인다.
+    새 예측이 없으면(If-None-Match == ETag) 본문 없이 304를 반환한다.
     """
-    return _build_dashboard_metrics()
+    # /predict 백그라운드 기록과 동시에 실행될 수 있으므로 스냅샷을 한 번만 뜨고,
+    # ETag/캐시 키와 본문을 모두 같은 스냅샷에서 계산한다
+    history = get_history_snapshot()
+    state = _history_state(history)
+    etag = _make_etag(state, since)
+    # no-cache: 브라우저가 매번 ETag로 재검증하도록 함
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
 
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
 
-@router.get("/dashboard", response_class=HTMLResponse)
-async def show_dashboard() -> HTMLResponse:
+    # 지표 계산은 동기 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행한다.
+    # (캐시 히트 시에는 스레드 전환 비용만 들지만, 히스토리가 길 때 /predict 등
+    #  다른 요청이 대기하지 않는 쪽이 더 중요함. NumPy 연산 구간은 GIL도 해제됨)
+    metrics = await run_in_threadpool(_cached_dashboard_metrics, history, state, since)
+    return ORJSONResponse(metrics, headers=headers)
+
+
+def install_stream_shutdown_hook() -> None:
     """
-    대시보드 HTML: 한 번만 로드하고, 내부 JS가 /dashboard/data를 주기적으로 호출해서
-    KPI/그래프를 부드럽게 갱신한다.
+    SIGTERM/SIGINT 핸들러를 감싸서, 종료 신호를 받는 즉시 열린 SSE 스트림을 끝낸다.
+    uvicorn은 열린 연결이 모두 끝난 뒤에야 shutdown 이벤트를 실행하므로, 스트림이 남아 있으면
+    graceful timeout까지 워커 종료가 늦어진다. (app startup 이벤트에서 호출.
+    이 시점에는 uvicorn – gunicorn UvicornWorker 포함 – 의 신호 핸들러가 이미 설치되어 있음)
     """
-    html = f"""
+    if threading.current_thread() is not threading.main_thread():
+        # 신호 핸들러는 메인 스레드에서만 설치 가능 (TestClient 등)
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(_STREAM_STOP.set)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+@router.get("/dashboard/stream")
+async def stream_dashboard() -> StreamingResponse:
+    """
+    새 예측이 기록될 때마다 SSE(Server-Sent Events)로 포인트({timestamp, prob_ng, range_start})를 push.
+    프런트는 받은 포인트를 차트에 바로 이어 붙이고 KPI도 직접 계산하므로, 연결 중에는 추가 요청이 없다.
+    (초기 로딩과 재연결 후 따라잡기는 /dashboard/data 사용)
+    """
+    queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+    subscriber = (asyncio.get_running_loop(), queue)
+
+    async def events():
+        with _SUBSCRIBERS_LOCK:
+            _SUBSCRIBERS.add(subscriber)
+        stop = asyncio.ensure_future(_STREAM_STOP.wait())
+        get = None
+        try:
+            # 연결이 끊기면 브라우저가 SSE_RETRY_MS 후 자동 재연결
+            yield f"retry: {SSE_RETRY_MS}\n\n".encode()
+            while not stop.done():
+                if get is None:
+                    get = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    {get, stop}, timeout=SSE_KEEPALIVE_SEC, return_when=asyncio.FIRST_COMPLETED
+                )
+                if stop in done:
+                    # 서버 종료 -> 응답을 끝내서 graceful shutdown이 기다리지 않게 함
+                    break
+                if get not in done:
+                    yield b": keep-alive\n\n"
+                    continue
+                data = get.result()
+                get = None
+                if data is None:
+                    yield b"event: resync\ndata: {}\n\n"
+                else:
+                    yield b"event: prediction\ndata: " + data + b"\n\n"
+        finally:
+            # 클라이언트 연결 종료 또는 서버 종료 시 구독 해제
+            stop.cancel()
+            if get is not None:
+                get.cancel()
+            with _SUBSCRIBERS_LOCK:
+                _SUBSCRIBERS.discard(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# 대시보드 HTML: 한 번만 로드하고, 내부 JS가 /dashboard/stream으로 받은 포인트(와 /dashboard/data 조회)로
+# KPI/그래프를 부드럽게 갱신한다.
+# REFRESH_INTERVAL_SEC는 import 시점에 확정되므로 페이지 내용은 항상 같다 -> 모듈 로드 시 1회만 생성
+_DASHBOARD_HTML_BYTES: bytes = f"""
 <!DOCTYPE html>
 <html lang="ko">
 <head>
     <meta charset="utf-8" />
     <title>Melting Tank Dashboard</title>
-    <!-- 브라우저 쪽에서 Plotly를 직접 로딩 -->
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
     <style>
         body {{
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
@@ -169,6 +434,16 @@ async def show_dashboard() -> HTMLResponse:
             margin: 0 auto;
             padding: 0;
         }}
+        .chart-skeleton {{
+            height: 500px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            border-radius: 12px;
+            background-color: #f4f6f8;
+            color: #999;
+            font-size: 14px;
+        }}
     </style>
 </head>
 <body>
@@ -186,14 +461,38 @@ async def show_dashboard() -> HTMLResponse:
     </div>
 
     <div id="chart-container">
+        <!-- Plotly 로딩 전까지 보여줄 자리 표시 -->
+        <div id="chart-skeleton" class="chart-skeleton">그래프 불러오는 중...</div>
         <div id="chart"></div>
     </div>
 
     <script>
         const REFRESH_INTERVAL_MS = {REFRESH_INTERVAL_SEC * 1000};
-
-        async function fetchDashboardData() {{
-            const resp = await fetch('/dashboard/data');
+        const STREAM_POLL_INTERVAL_MS = {STREAM_POLL_INTERVAL_SEC * 1000};
+        // KPI 계산 기준 (서버 _build_dashboard_metrics와 같은 값)
+        const RECENT_WINDOW = {RECENT_WINDOW_DEFAULT};
+        const STREAK_N = {STREAK_N};
+        // push로 받은 포인트만으로 KPI를 계산하기 위해 클라이언트가 들고 있는 최근 확률(%) 개수
+        // (서버는 최근 DOWNSAMPLE_KEEP_RAW개를 다운샘플링 없이 보내므로 응답 꼬리로 채울 수 있음)
+        const RECENT_KEEP = {DOWNSAMPLE_KEEP_RAW};
+        // 서버 marker_colors와 같은 색
+        const NG_COLOR = '#e74c3c';
+        const OK_COLOR = '#2980b9';
+        // 브라우저 쪽에서 Plotly를 직접 로딩 (차트가 화면에 보일 때 지연 로딩)
+        // scatter(lines+markers) + rect shape만 사용하므로 basic 번들이면 충분 (full 번들 대비 수 배 작음)
+        const PLOTLY_SRC = 'https://cdn.plot.ly/plotly-basic-2.35.2.min.js';
+        // 마지막으로 반영한 포인트의 timestamp. 다음 요청부터는 이 이후의 포인트만 받는다.
+        let lastTs = null;
+        // push 포인트로 KPI를 계산할 때 쓰는 상태 (마지막 응답/포인트 기준)
+        let recentProbs = [];
+        let thresholdPercent = null;
+        let maxPoints = null;
+
+        async function fetchDashboardData(full) {{
+            const url = full
+                ? '/dashboard/data'
+                : `/dashboard/data?since=${{lastTs}}`;
+            const resp = await fetch(url);
             if (!resp.ok) {{
                 console.error('Failed to load dashboard data:', resp.status);
                 return null;
@@ -263,17 +562,115 @@ async def show_dashboard() -> HTMLResponse:
             }}
         }}
 
-        function renderChart(data, isInitial) {{
+        // layout/config는 한 번만 만들고, 갱신 시에는 값만 바꿔서 Plotly.react에 넘긴다
+        const CHART_LAYOUT = {{
+            margin: {{ l: 40, r: 40, t: 60, b: 40 }},
+            height: 500,
+            xaxis: {{ title: '시간', type: 'date' }},
+            yaxis: {{ title: '불량 발생 확률(%)', range: [0, 100] }},
+            legend: {{
+                orientation: 'h',
+                x: 0.5,
+                xanchor: 'center',
+                y: 1.1,
+            }},
+            shapes: [
+                {{
+                    type: 'rect',
+                    xref: 'x',
+                    yref: 'y',
+                    x0: null,
+                    x1: null,
+                    y0: null,
+                    y1: 100,
+                    fillcolor: 'rgba(255, 0, 0, 0.1)',
+                    line: {{ width: 0 }},
+                    layer: 'below',
+                }}
+            ],
+        }};
+
+        const CHART_CONFIG = {{
+            responsive: true,
+            displaylogo: false,
+        }};
+
+        let chartInitialized = false;
+
+        const toDate = (ms) => new Date(ms);
+
+        // 차트 끝에 포인트를 이어 붙이고, 서버 히스토리에서 밀려난 포인트와 Threshold 선을 정리
+        function appendChartPoints(xs, ys, colors, rangeStart, xEndMs) {{
+            const chartDiv = document.getElementById('chart');
+            // 서버 히스토리 길이(max_points)를 넘는 오래된 포인트는 잘라냄
+            Plotly.extendTraces(chartDiv, {{
+                x: [xs.map(toDate)],
+                y: [ys],
+                'marker.color': [colors],
+            }}, [0], maxPoints);
+            // 첫 차트가 다운샘플링된 경우 포인트 수만으로는 잘리지 않으므로,
+            // 서버에서 이미 밀려난(range_start 이전) 포인트는 시간 기준으로 잘라냄
+            const trace = chartDiv.data[0];
+            let drop = 0;
+            while (drop < trace.x.length && new Date(trace.x[drop]).getTime() < rangeStart) {{
+                drop += 1;
+            }}
+            if (drop > 0) {{
+                Plotly.restyle(chartDiv, {{
+                    x: [trace.x.slice(drop)],
+                    y: [trace.y.slice(drop)],
+                    'marker.color': [trace.marker.color.slice(drop)],
+                }}, [0]);
+            }}
+            const xStart = new Date(rangeStart);
+            const xEnd = new Date(xEndMs);
+            Plotly.update(chartDiv, {{ x: [[xStart, xEnd]] }}, {{
+                'shapes[0].x0': xStart,
+                'shapes[0].x1': xEnd,
+                'shapes[0].y0': thresholdPercent,
+            }}, [1]);
+        }}
+
+        function renderChart(data) {{
             const chartDiv = document.getElementById('chart');
 
-            if (!data || !data.has_data || data.timestamps.length === 0) {{
+            if (!data || !data.has_data) {{
                 Plotly.purge(chartDiv);
+                chartInitialized = false;
+                return;
+            }}
+
+            if (chartInitialized && data.incremental) {{
+                // 이미 그린 포인트(lastTs 이하)는 제외하고 새 포인트만 이어 붙임
+                let first = 0;
+                while (first < data.timestamps.length && lastTs !== null && data.timestamps[first] <= lastTs) {{
+                    first += 1;
+                }}
+                if (first < data.timestamps.length) {{
+                    appendChartPoints(
+                        data.timestamps.slice(first),
+                        data.prob_ng_percent.slice(first),
+                        data.marker_colors.slice(first),
+                        data.range_start,
+                        data.last.timestamp,
+                    );
+                }}
                 return;
             }}
 
-            const x = data.timestamps;
-            const y = data.prob_ng_percent;
             const threshold = data.threshold_percent;
+            // 서버는 epoch ms로 보내고, Date 객체로 넘겨서 브라우저 로컬 시각으로 표시
+            const xStart = new Date(data.range_start);
+            const xEnd = new Date(data.last.timestamp);
+
+            // 임계 영역 shape는 새로 만들지 않고 좌표만 갱신
+            const band = CHART_LAYOUT.shapes[0];
+            band.x0 = xStart;
+            band.x1 = xEnd;
+            band.y0 = threshold;
+
+            const x = data.timestamps.map(toDate);
+            const y = data.prob_ng_percent;
             const markerColors = data.marker_colors;
 
             const traceProb = {{
@@ -287,7 +684,7 @@ async def show_dashboard() -> HTMLResponse:
             }};
 
             const traceThreshold = {{
-                x: [x[0], x[x.length - 1]],
+                x: [xStart, xEnd],
                 y: [threshold, threshold],
                 mode: 'lines',
                 name: `Threshold (${{threshold.toFixed(1)}}%)`,
@@ -295,61 +692,226 @@ async def show_dashboard() -> HTMLResponse:
                 hovertemplate: `Threshold 기준값: ${{threshold.toFixed(1)}}%<extra></extra>`,
             }};
 
-            const layout = {{
-                margin: {{ l: 40, r: 40, t: 60, b: 40 }},
-                height: 500,
-                xaxis: {{ title: '시간', type: 'date' }},
-                yaxis: {{ title: '불량 발생 확률(%)', range: [0, 100] }},
-                legend: {{
-                    orientation: 'h',
-                    x: 0.5,
-                    xanchor: 'center',
-                    y: 1.1,
+            if (!chartInitialized) {{
+                document.getElementById('chart-skeleton').style.display = 'none';
+                Plotly.newPlot(chartDiv, [traceProb, traceThreshold], CHART_LAYOUT, CHART_CONFIG);
+                chartInitialized = true;
+            }} else {{
+                // 변경된 부분만 diff 해서 반영 (SVG 전체 재생성 없음)
+                Plotly.react(chartDiv, [traceProb, traceThreshold], CHART_LAYOUT, CHART_CONFIG);
+            }}
+        }}
+
+        // 응답에 담긴 포인트를 lastTs/recentProbs에 반영 (renderChart 이후에 호출)
+        function trackPoints(data) {{
+            if (!data || !data.has_data) {{
+                lastTs = null;
+                recentProbs = [];
+                return;
+            }}
+            thresholdPercent = data.threshold_percent;
+            maxPoints = data.max_points;
+            if (!data.incremental) {{
+                recentProbs = data.prob_ng_percent.slice(-RECENT_KEEP);
+                lastTs = data.last.timestamp;
+                return;
+            }}
+            for (let i = 0; i < data.timestamps.length; i += 1) {{
+                if (lastTs === null || data.timestamps[i] > lastTs) {{
+                    recentProbs.push(data.prob_ng_percent[i]);
+                }}
+            }}
+            recentProbs = recentProbs.slice(-Math.min(RECENT_KEEP, maxPoints));
+            // 응답 순서가 뒤바뀌어도 lastTs가 뒤로 가지 않도록 유지
+            lastTs = Math.max(lastTs, data.last.timestamp);
+        }}
+
+        // recentProbs로 /dashboard/data와 같은 형태의 KPI 데이터를 만듦 (push 포인트 반영용)
+        function kpisFromRecent(lastProbPercent, lastTimestamp) {{
+            const size = Math.min(RECENT_WINDOW, recentProbs.length);
+            const tail = recentProbs.slice(-size);
+            const ngCount = tail.filter((p) => p >= thresholdPercent).length;
+            const isStreak = recentProbs.length >= STREAK_N
+                && recentProbs.slice(-STREAK_N).every((p) => p >= thresholdPercent);
+            return {{
+                has_data: true,
+                threshold_percent: thresholdPercent,
+                last: {{
+                    prob_percent: lastProbPercent,
+                    status_label: lastProbPercent >= thresholdPercent ? 'NG' : 'OK',
+                    timestamp: lastTimestamp,
                 }},
-                shapes: [
-                    {{
-                        type: 'rect',
-                        xref: 'x',
-                        yref: 'y',
-                        x0: x[0],
-                        x1: x[x.length - 1],
-                        y0: threshold,
-                        y1: 100,
-                        fillcolor: 'rgba(255, 0, 0, 0.1)',
-                        line: {{ width: 0 }},
-                        layer: 'below',
-                    }}
-                ],
+                recent: {{
+                    window: size,
+                    avg_prob_percent: tail.reduce((acc, p) => acc + p, 0) / size,
+                    ng_ratio_recent: (ngCount / size) * 100.0,
+                    ng_count_recent: ngCount,
+                }},
+                streak_ng: isStreak ? {{ streak_n: STREAK_N, is_streak: true }} : null,
             }};
+        }}
 
-            const config = {{
-                responsive: true,
-                displaylogo: false,
-            }};
+        // 갱신은 한 번에 하나만 실행 (동시에 같은 since로 조회하면 같은 포인트를 두 번 이어 붙이게 됨)
+        // 실행 중에 들어온 요청은 하나로 합쳐서, 끝난 뒤 한 번 더 실행
+        let refreshInFlight = false;
+        let refreshQueued = false;
+        // 탭이 숨겨져 있어서 미뤄 둔 갱신이 있는지 (다시 보이면 바로 따라잡음)
+        let refreshPending = false;
+        let lastRefreshAt = 0;
+
+        async function refreshDashboard() {{
+            if (refreshInFlight) {{
+                refreshQueued = true;
+                return;
+            }}
+            refreshInFlight = true;
+            refreshPending = false;
+            try {{
+                do {{
+                    refreshQueued = false;
+                    try {{
+                        // Plotly가 막 로딩됐으면 차트를 처음부터 그려야 하므로 전체 조회
+                        const full = lastTs === null || (window.Plotly && !chartInitialized);
+                        const data = await fetchDashboardData(full);
+                        lastRefreshAt = Date.now();
+                        if (data) {{
+                            renderKpis(data);
+                            // Plotly 로딩 전에는 KPI만 갱신 (차트는 로딩 완료 후 전체 데이터로 그림)
+                            if (window.Plotly && (!data.incremental || chartInitialized)) {{
+                                renderChart(data);
+                            }}
+                            trackPoints(data);
+                        }}
+                    }} catch (err) {{
+                        console.error('Dashboard refresh error:', err);
+                    }}
+                }} while (refreshQueued);
+            }} finally {{
+                refreshInFlight = false;
+            }}
+        }}
 
-            if (isInitial) {{
-                Plotly.newPlot(chartDiv, [traceProb, traceThreshold], layout, config);
+        function refreshIfVisible() {{
+            if (document.visibilityState === 'visible') {{
+                refreshDashboard();
             }} else {{
-                Plotly.react(chartDiv, [traceProb, traceThreshold], layout, config);
+                refreshPending = true;
             }}
         }}
 
-        async function refreshDashboard(isInitial) {{
-            try {{
-                const data = await fetchDashboardData();
-                renderKpis(data);
-                renderChart(data, isInitial);
-            }} catch (err) {{
-                console.error('Dashboard refresh error:', err);
+        // SSE로 받은 포인트를 /dashboard/data 재조회 없이 바로 반영
+        function applyPushedPoint(event) {{
+            // 아직 기준 데이터가 없거나 조회 중이면 조회 결과(since)로 반영
+            if (lastTs === null || refreshInFlight) {{
+                refreshIfVisible();
+                return;
+            }}
+            const point = JSON.parse(event.data);
+            if (point.timestamp <= lastTs) {{
+                return;
+            }}
+            const probPercent = point.prob_ng * 100.0;
+            if (chartInitialized) {{
+                const color = probPercent >= thresholdPercent ? NG_COLOR : OK_COLOR;
+                appendChartPoints([point.timestamp], [probPercent], [color], point.range_start, point.timestamp);
+            }}
+            recentProbs.push(probPercent);
+            recentProbs = recentProbs.slice(-Math.min(RECENT_KEEP, maxPoints));
+            lastTs = point.timestamp;
+            renderKpis(kpisFromRecent(probPercent, point.timestamp));
+        }}
+
+        let plotlyLoading = null;
+
+        function loadPlotly() {{
+            if (!plotlyLoading) {{
+                plotlyLoading = new Promise((resolve, reject) => {{
+                    const script = document.createElement('script');
+                    script.src = PLOTLY_SRC;
+                    script.async = true;
+                    script.onload = resolve;
+                    script.onerror = reject;
+                    document.head.appendChild(script);
+                }});
             }}
+            return plotlyLoading;
         }}
 
-        // 초기 1회 렌더
-        refreshDashboard(true);
-        // 이후에는 지정한 주기로 KPI/그래프만 갱신 (페이지 깜빡임 없음)
-        setInterval(() => refreshDashboard(false), REFRESH_INTERVAL_MS);
+        function loadChartWhenVisible() {{
+            const loadAndRender = () => loadPlotly()
+                .then(() => refreshDashboard())
+                .catch((err) => console.error('Failed to load Plotly:', err));
+
+            if (!('IntersectionObserver' in window)) {{
+                loadAndRender();
+                return;
+            }}
+            const observer = new IntersectionObserver((entries) => {{
+                if (entries.some((entry) => entry.isIntersecting)) {{
+                    observer.disconnect();
+                    loadAndRender();
+                }}
+            }});
+            observer.observe(document.getElementById('chart-container'));
+        }}
+
+        // 초기 1회 렌더 (KPI는 바로, 차트는 화면에 보일 때 Plotly를 받아서)
+        refreshDashboard();
+        loadChartWhenVisible();
+
+        // 이후에는 새 예측이 기록될 때마다 서버가 SSE로 포인트를 보내주고, 그 값으로 바로 갱신
+        // SSE가 연결되어 있으면 polling은 STREAM_POLL_INTERVAL_MS마다만 (다른 워커에서 처리된 예측 따라잡기),
+        // 연결이 없거나 끊긴 동안에는 REFRESH_INTERVAL_MS마다 polling. 새 예측이 없으면 304라 비용이 작음
+        // 탭이 백그라운드/최소화 상태면 요청하지 않고, 다시 보이는 순간 바로 따라잡음
+        let stream = null;
+        // 연결이 한 번 끊겼는지 (재연결 시에만 놓친 포인트를 따라잡음)
+        let streamDropped = false;
+        const streamOpen = () => stream !== null && stream.readyState === EventSource.OPEN;
+
+        if ('EventSource' in window) {{
+            stream = new EventSource('/dashboard/stream');
+            stream.addEventListener('prediction', applyPushedPoint);
+            // 서버 큐가 넘쳐서 포인트가 버려진 경우
+            stream.addEventListener('resync', refreshIfVisible);
+            stream.onopen = () => {{
+                if (streamDropped) {{
+                    streamDropped = false;
+                    refreshIfVisible();
+                }}
+            }};
+            // 브라우저가 retry 간격 후 자동 재연결하므로 여기서는 표시만 해 둠
+            stream.onerror = () => {{
+                streamDropped = true;
+            }};
+        }}
+
+        setInterval(() => {{
+            if (streamOpen() && Date.now() - lastRefreshAt < STREAM_POLL_INTERVAL_MS) {{
+                return;
+            }}
+            refreshIfVisible();
+        }}, REFRESH_INTERVAL_MS);
+
+        document.addEventListener('visibilitychange', () => {{
+            // 숨겨진 동안에도 push 포인트는 반영되므로, 미뤄 둔 갱신이 있거나 SSE가 없을 때만 조회
+            if (document.visibilityState === 'visible' && (refreshPending || !streamOpen())) {{
+                refreshDashboard();
+            }}
+        }});
     </script>
 </body>
 </html>
+""".encode("utf-8")
+
+
+@router.get("/dashboard", response_class=HTMLResponse)
+async def show_dashboard() -> HTMLResponse:
+    """
+    미리 만들어 둔 대시보드 HTML을 그대로 반환.
+    내용이 바뀌지 않으므로 브라우저/CDN이 5분간 재사용하도록 Cache-Control을 붙인다.
     """
-    return HTMLResponse(html)
+    return HTMLResponse(
+        content=_DASHBOARD_HTML_BYTES,
+        media_type="text/html",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
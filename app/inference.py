@@ -1,12 +1,18 @@
-import pandas as pd
-from typing import List, Dict, Tuple
-from tensorflow import keras
+import threading
+
+import numpy as np
+from typing import TYPE_CHECKING, Callable, Tuple
 from sklearn.preprocessing import MinMaxScaler
 
+# TensorFlow(keras 백엔드)와 ai_edge_litert(tflite 백엔드)는 각 백엔드의 생성 함수 안에서만 import
+# -> 선택하지 않은 런타임은 로드하지 않음 (tflite 백엔드에서는 TF 전체 import 시간/메모리 절감)
+if TYPE_CHECKING:
+    from tensorflow import keras
+
 # --- 프로젝트 모듈 임포트 ---
 # utils에서 LSTM 시퀀스 변환 로직, 상수 등을 가져옴
 from app import utils 
-from app.schemas import LSTM_SEQUENCE_LENGTH 
+from app.schemas import LSTM_SEQUENCE_LENGTH, READING_FIELDS
 
 
 # 버전 정보
@@ -19,18 +25,94 @@ SEQUENCE_LENGTH = 10
 # 훈련 시 사용된 컬럼 순서 및 이름을 명확히 정의
 FEATURE_COLUMNS = ["MELT_TEMP", "MOTORSPEED"]
 
+# 요청 배열(READING_FIELDS 순서)에서 FEATURE_COLUMNS 순서대로 컬럼을 고르는 인덱스
+_FEATURE_INDEX = np.array([READING_FIELDS.index(c) for c in FEATURE_COLUMNS])
+
+# (1, LSTM_SEQUENCE_LENGTH, n_features) float32 입력 -> (1, 1) 불량 확률 출력
+InferFn = Callable[[np.ndarray], np.ndarray]
+
+
+# ----------------------------------------------------------------------------------
+# [초기화 로직] 추론 함수 생성 (make_infer_fn)
+# ----------------------------------------------------------------------------------
+def build_serving_function(model: "keras.Model"):
+    """
+    [책임: 고정 입력 shape 그래프 생성]
+    배치 크기 1 고정 입력 signature로 tf.function을 만들어, 요청마다 재트레이싱 없이
+    같은 그래프를 재사용하도록 합니다.
+    """
+    import tensorflow as tf
+
+    @tf.function(
+        input_signature=[
+            tf.TensorSpec((1, LSTM_SEQUENCE_LENGTH, len(FEATURE_COLUMNS)), tf.float32)
+        ]
+    )
+    def serve(x):
+        return model(x, training=False)
+
+    return serve
+
+
+def make_infer_fn(model: "keras.Model") -> InferFn:
+    """
+    [책임: 단건 추론 함수 제공]
+    model.predict()는 배치 루프/콜백 준비 등 호출당 파이썬 오버헤드가 커서
+    배치 크기 1 실시간 추론에는 부적합하므로, 트레이싱된 그래프를 직접 호출하는 함수를 반환합니다.
+    서버 시작 시 1회 생성해서 재사용합니다.
+    """
+    import tensorflow as tf
+
+    serve = build_serving_function(model)
+    # 첫 요청에서 트레이싱 지연이 생기지 않도록 시작 시점에 미리 그래프 생성
+    serve.get_concrete_function()
+
+    def infer(x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        return serve(tf.convert_to_tensor(x)).numpy()
+
+    return infer
+
+
+def make_tflite_infer_fn(model_path: str, num_threads: int = 1) -> InferFn:
+    """
+    [책임: TFLite 단건 추론 함수 제공]
+    convert_tflite.py로 변환한 모델을 LiteRT Interpreter로 로드합니다.
+    (tf.lite.Interpreter는 TF 2.20에서 삭제 예정이므로 후속 패키지인 ai_edge_litert 사용)
+    텐서 할당은 시작 시 1회만 수행하고, 요청마다 set_tensor/invoke만 호출합니다.
+    Interpreter는 스레드 안전하지 않으므로 스레드풀 동시 호출은 Lock으로 직렬화합니다.
+    """
+    from ai_edge_litert.interpreter import Interpreter
+
+    interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    input_index = interpreter.get_input_details()[0]["index"]
+    output_index = interpreter.get_output_details()[0]["index"]
+    lock = threading.Lock()
+
+    def infer(x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        with lock:
+            interpreter.set_tensor(input_index, x)
+            interpreter.invoke()
+            # get_tensor는 복사본을 반환하므로 Lock 밖에서 사용해도 안전
+            return interpreter.get_tensor(output_index)
+
+    return infer
+
 
 # ----------------------------------------------------------------------------------
 # [핵심 로직] 불량 확률 예측 (predict_prob)
 # ----------------------------------------------------------------------------------
 def predict_prob(
-    readings: List[Dict], 
-    model: keras.Model, 
+    readings: np.ndarray, 
+    infer_fn: InferFn, 
     scaler: MinMaxScaler 
 ) -> float:
     """
     [책임: 추론 수행]
-    실시간 센서 데이터 리스트를 받아 정규화 및 윈도우링 후 LSTM 모델로 불량 확률을 예측합니다.
+    실시간 센서 데이터 배열을 받아 정규화 및 윈도우링 후 LSTM 모델로 불량 확률을 예측합니다.
+    readings는 PredictRequest.to_array()의 (LSTM_SEQUENCE_LENGTH, len(READING_FIELDS)) float32 배열.
     """
     
     # 1. 데이터 유효성 검사 (Data Integrity Check)
@@ -42,17 +124,16 @@ def predict_prob(
         )
 
     # 2. 데이터 전처리 및 정렬 (Data Engineering)
-    # Pandas DataFrame으로 변환 및 훈련 데이터와 동일한 순서로 컬럼 정렬
-    df = pd.DataFrame(readings)
-    df = df[FEATURE_COLUMNS] 
+    # 훈련 데이터와 동일한 컬럼 순서로 특징 컬럼만 선택 (DataFrame 생성 없이 NumPy 인덱싱)
+    X_raw = readings[:, _FEATURE_INDEX]
 
     # 3. 데이터 변환 (책임 분리: utils.py에 위임)
     # 훈련 시 스케일러와 윈도우링 로직을 utils에 위임하여 처리 효율성 및 클린 코드 준수
-    X_inference = utils.prepare_lstm_input(df, scaler, LSTM_SEQUENCE_LENGTH)
+    X_inference = utils.prepare_lstm_input(X_raw, scaler, LSTM_SEQUENCE_LENGTH)
     
     # 4. 모델 예측 (Prediction)
-    # 성능 최적화: 모델이 메모리에 상주하므로 로드 과정 없이 바로 predict 호출
-    prediction = model.predict(X_inference, verbose=0)
+    # 성능 최적화: 서버 시작 시 만든 추론 함수(트레이싱된 그래프)를 바로 호출
+    prediction = infer_fn(X_inference)
     prob_ng = prediction[0][0] # 불량 확률 추출
 
     # NumPy float32를 Python float으로 변환하여 API 직렬화 문제 방지
@@ -2,19 +2,29 @@ import os
 import logging
 import joblib
 from dotenv import load_dotenv
-from tensorflow import keras
 from fastapi import FastAPI, Header, Depends, HTTPException, status
 from fastapi import BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from typing import Annotated
-from .dashboard import router as dashboard_router
+from .dashboard import router as dashboard_router, install_stream_shutdown_hook, publish_prediction
 
 # --- 프로젝트 모듈 임포트 ---
 # utils는 인증, 환경 변수 로드, 알림 등 보조 기능 담당
-from .utils import authenticate_api_key, send_alert_notification
+from .utils import (
+    authenticate_api_key,
+    close_http_client,
+    flush_s3_logs,
+    init_scaler_cache,
+    log_prediction_result,
+    send_alert_notification,
+    start_s3_log_flusher,
+    stop_s3_log_flusher,
+)
 # schemas는 데이터 유효성 검사 및 규격 정의 담당
 from .schemas import PredictRequest, PredictResponse
 # inference는 모델 추론 로직 담당
-from .inference import predict_prob, post_process, VERSION
+from .inference import make_infer_fn, make_tflite_infer_fn, predict_prob, post_process, VERSION
 from .storage import add_prediction_result
 
 
@@ -45,13 +55,30 @@ THRESHOLD = float(os.getenv("PREDICTION_THRESHOLD", 0.5)) # 임계값 로드
 ## MLOps 환경에서 가장 중요하며, API의 응답 속도(Latency)를 보장합
 ## =================================================================
 MODEL_PATH = "model/best_model.keras"         ## 모델 파일 경로
+TFLITE_MODEL_PATH = os.getenv("TFLITE_MODEL_PATH", "model/best_model.tflite")  ## 변환된 TFLite 모델 경로
 SCALER_PATH = "artifacts/minmax_scaler.joblib"    ## 스케일러 파일 경로
+## 추론 백엔드: keras (기본) | tflite (convert_tflite.py로 변환한 모델 사용, CPU 단건 추론에 유리)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras").lower()
 
+MODEL = None
 try:
     ## 모델과 스케일러를 메모리에 로드
-    MODEL = keras.models.load_model(MODEL_PATH, compile=False)
     SCALER = joblib.load(SCALER_PATH)
-    logging.info(f"[INFO] 모델({MODEL_PATH}) 및 스케일러 로드 완료.")
+    ## 요청마다 sklearn transform을 거치지 않도록 정규화 계수를 float32로 미리 캐시
+    init_scaler_cache(SCALER)
+    if INFERENCE_BACKEND == "tflite":
+        ## TFLite 백엔드는 Keras 모델도, TensorFlow 자체도 로드하지 않음 (메모리 사용량/기동 시간 감소)
+        INFER_FN = make_tflite_infer_fn(TFLITE_MODEL_PATH)
+        loaded_model_path = TFLITE_MODEL_PATH
+    else:
+        ## TF는 keras 백엔드에서만 import (tflite 백엔드는 TF 전체를 로드하지 않음)
+        from tensorflow import keras
+
+        MODEL = keras.models.load_model(MODEL_PATH, compile=False)
+        ## 단건 추론용 그래프 함수 (model.predict 대비 호출당 오버헤드가 작음)
+        INFER_FN = make_infer_fn(MODEL)
+        loaded_model_path = MODEL_PATH
+    logging.info(f"[INFO] 모델({loaded_model_path}) 및 스케일러 로드 완료. backend={INFERENCE_BACKEND}")
 except Exception as e:
     ## 파일이 없거나 로드 오류 발생 시 서버 시작을 중단하여 배포 실패를 명확히
     logging.info(f"[ERROR] 모델/스케일러 로드 실패! 서버를 시작할 수 없습니다. 에러: {e}")
@@ -74,11 +101,29 @@ def get_api_key(x_api_key: Annotated[str | None, Header(alias="x-api-key")] = No
 app = FastAPI(
     title="Melting Tank Quality API",
     version=VERSION,
+    # orjson 기반 JSON 직렬화 (기본 json.dumps 대비 빠름)
+    default_response_class=ORJSONResponse,
     # dependencies=[Depends(get_api_key)] # 모든 API 요청에 인증 적용
 )
 
 ## 대시보드 라우터 등록
 app.include_router(dashboard_router)
+## 서버 종료 신호를 받으면 열린 대시보드 SSE 스트림을 바로 끝냄 (graceful shutdown 지연 방지)
+app.add_event_handler("startup", install_stream_shutdown_hook)
+
+## 서버 종료 시 Slack 알림용 httpx 클라이언트 정리
+app.add_event_handler("shutdown", close_http_client)
+## 예측 로그 버퍼를 S3_LOG_FLUSH_INTERVAL_SEC마다 업로드 (요청이 끊겨도 로그가 버퍼에 머물지 않도록)
+app.add_event_handler("startup", start_s3_log_flusher)
+## 서버 종료 시 주기 업로드를 멈추고, 버퍼에 남은 예측 로그를 S3에 업로드
+## (uvicorn은 SIGTERM 처리 후 시그널을 다시 발생시켜 종료하므로 atexit만으로는 실행되지 않을 수 있음)
+app.add_event_handler("shutdown", stop_s3_log_flusher)
+app.add_event_handler("shutdown", flush_s3_logs)
+
+def record_prediction(prob_ng: float) -> None:
+    """예측 결과를 히스토리에 저장하고, 대시보드 구독자(SSE)에게 새 포인트를 알림"""
+    record = add_prediction_result(prob_ng)
+    publish_prediction(record)
 
 ## =================================================================
 # 4. 엔드포인트 정의
@@ -89,16 +134,18 @@ def root():
     return {"message": "Melting Tank Quality API is running", "version": VERSION}
 
 @app.post("/predict", dependencies=[Depends(get_api_key)], response_model=PredictResponse)
-def predict(req: PredictRequest, background: BackgroundTasks):
+async def predict(req: PredictRequest, background: BackgroundTasks):
     """
     실시간 센서 데이터로 불량률을 예측하고, 임계값 초과 시 알림을 전송합니다.
     """
-    # 1. 예측 실행: 전역 로드된 MODEL과 SCALER를 inference 함수에 전달
+    # 1. 예측 실행: 전역 로드된 추론 함수와 SCALER를 inference 함수에 전달
+    # 모델 추론(TF C++ 연산, GIL 해제)만 스레드풀에서 실행하고, 나머지는 이벤트 루프에서 처리
     try:
-        prob_ng = predict_prob(
-            readings=[r.model_dump() for r in req.readings], 
-            model=MODEL, 
-            scaler=SCALER
+        prob_ng = await run_in_threadpool(
+            predict_prob,
+            readings=req.to_array(),
+            infer_fn=INFER_FN,
+            scaler=SCALER,
         )
     except ValueError as e:
         # 데이터 길이 미달 등 inference.py에서 발생한 유효성 검사 에러 처리
@@ -111,16 +158,17 @@ def predict(req: PredictRequest, background: BackgroundTasks):
     label, th = post_process(prob_ng, THRESHOLD)
 
     # 3. MLOps 데이터 로깅 (추가)
-    # 전역 리스트에 예측 결과 저장
-    add_prediction_result(prob_ng) 
+    # 전역 히스토리에 예측 결과 저장 + 대시보드 push (응답 전송 후 백그라운드에서 처리)
+    background.add_task(record_prediction, prob_ng)
 
     # 4. MLOps 알림 로직 (utils.py 사용)
+    # Slack 전송(async)은 응답 전송 후 이벤트 루프에서 실행되어 /predict 지연에 포함되지 않음
     if label == "NG":
         message = f"🚨 불량 감지 경고! 예측 확률: {prob_ng:.2f} (임계값: {th})"
         background.add_task(send_alert_notification, message, SLACK_WEBHOOK_URL)
         
-    # 4. 결과 로깅 (운영 환경에서는 비동기적으로 처리)
-    # log_prediction_result(req.readings, prob_ng, label, VERSION) # 비동기 로깅 구현 시 사용
+    # 5. 결과 로깅 (S3 업로드는 동기 boto3라 BackgroundTasks가 스레드풀에서 실행)
+    background.add_task(log_prediction_result, req.to_array(), prob_ng, label, VERSION)
 
     return PredictResponse(prob_ng=prob_ng, label=label, threshold=th, version=VERSION)
 
@@ -132,7 +180,7 @@ def healthz():
 def readyz():
     try:
         _ = SCALER  # 로드 여부 확인
-        _ = MODEL   # 로드 여부 확인
+        _ = INFER_FN  # 로드 여부 확인
         return {"ready": True, "version": VERSION}
     except Exception:
         raise HTTPException(status_code=503, detail="Not ready")
\ No newline at end of file
@@ -1,11 +1,16 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import List
+import numpy as np
+from operator import attrgetter
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
+from typing import Any, List, Optional
 
 
 ## --- 1. LSTM 시퀀스 길이 정의 ---
 ## 이 값은 inference.py의 SEQUENCE_LENGTH와 일치
 LSTM_SEQUENCE_LENGTH = 10
 
+## 센서 값 배열의 컬럼 순서 (Reading 필드 순서 / 리스트 형식 입력의 각 행 순서)
+READING_FIELDS = ("MELT_TEMP", "MOTORSPEED", "MELT_WEIGHT", "INSP")
+
 ## --- 2. 입력 데이터 유효성 검사를 위한 Base Model ---
 ## 입력 데이터 규격: 단일 시점의 센서 데이터
 class Reading(BaseModel):
@@ -24,26 +29,105 @@ class Reading(BaseModel):
     ## 예: MELT_TEMP_MEAN: float = Field(..., description="1분 평균 용해 온도")
 
 
+# Reading 1개 -> READING_FIELDS 순서의 값 튜플
+_READING_GETTER = attrgetter(*READING_FIELDS)
+
+
 # --- 3. API 요청 규격 (시퀀스 길이 유효성 검사) ---
 class PredictRequest(BaseModel):
     """
     [책임: 요청 데이터 유효성 검사]
     모델 추론을 위한 전체 시퀀스 데이터 리스트 규격 정의.
+    readings(디버깅/수동 호출용) 또는 readings_flat(시뮬레이터 등 기계 전송용) 중 하나만 보냅니다.
     """
-    readings: List[Reading] = Field(..., description=f"LSTM 모델 추론을 위한 {LSTM_SEQUENCE_LENGTH}개 데이터 포인트 시퀀스")
+    # 숫자 리스트의 리스트 형식은 parse_list_rows에서 Reading 모델 없이 바로 배열로 변환 (스키마에는 Reading 형식만 표시)
+    # -> 그 경우 readings 값은 검증된 (L, F) float32 ndarray
+    readings: Optional[List[Reading]] = Field(
+        None,
+        description=(
+            f"LSTM 모델 추론을 위한 {LSTM_SEQUENCE_LENGTH}개 데이터 포인트 시퀀스. "
+            f"Reading 객체 리스트 또는 {list(READING_FIELDS)} 순서의 숫자 리스트의 리스트"
+        ),
+    )
+    readings_flat: Optional[List[float]] = Field(
+        None,
+        description=(
+            f"{list(READING_FIELDS)} 순서의 행을 시간 순으로 이어 붙인 "
+            f"{LSTM_SEQUENCE_LENGTH * len(READING_FIELDS)}개 숫자 (행 우선, C order)"
+        ),
+    )
+
+    # 검증된 센서 값 배열 ((LSTM_SEQUENCE_LENGTH, len(READING_FIELDS)) float32) - to_array()로 접근
+    _array: np.ndarray = PrivateAttr()
 
     # [보강] 시퀀스 길이 유효성 검사 (@validator) - API 레이어에서의 책임 분리
     # 성능 최적화: 유효하지 않은 요청은 모델 추론 전에 빠르게 거절합니다.
     @field_validator('readings')
-    def validate_sequence_length(cls, readings: List[Reading]):
+    def validate_sequence_length(cls, readings: Optional[List[Reading]]):
         """입력된 데이터의 길이가 LSTM이 요구하는 시퀀스 길이와 일치하는지 검사합니다."""
-        if len(readings) != LSTM_SEQUENCE_LENGTH:
+        if readings is not None and len(readings) != LSTM_SEQUENCE_LENGTH:
             raise ValueError(
                 f"Data integrity error: LSTM model requires exactly {LSTM_SEQUENCE_LENGTH} data points. "
                 f"Received {len(readings)}."
             )
         return readings
 
+    # 성능 최적화: 숫자 리스트의 리스트 입력은 행 단위 Reading 모델 생성/필드 검증 없이
+    # NumPy로 한 번에 변환 및 shape 검사 (첫 행의 타입만 보고 결정하므로 다른 형식을 시도하지 않음)
+    @field_validator('readings', mode='wrap')
+    @classmethod
+    def parse_list_rows(cls, readings: Any, handler):
+        """readings가 [[MELT_TEMP, MOTORSPEED, MELT_WEIGHT, INSP], ...] 형식이면 바로 배열로 변환합니다."""
+        if not (isinstance(readings, list) and readings and isinstance(readings[0], (list, tuple))):
+            return handler(readings)
+
+        try:
+            arr = np.asarray(readings, dtype=np.float32)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Data integrity error: readings rows must be lists of numbers. {e}")
+
+        expected_shape = (LSTM_SEQUENCE_LENGTH, len(READING_FIELDS))
+        if arr.shape != expected_shape:
+            raise ValueError(
+                f"Data integrity error: readings must have shape {expected_shape}. Received {arr.shape}."
+            )
+        # float32 변환은 None을 NaN으로 바꾸므로, 필드 검증 대신 결측/비정상 값을 한 번에 거절
+        if not np.isfinite(arr).all():
+            raise ValueError("Data integrity error: readings must not contain null, NaN or infinite values.")
+        return arr
+
+    # Reading 리스트 / readings_flat 입력을 배열로 변환 (숫자 리스트의 리스트 입력은 parse_list_rows에서 처리)
+    @model_validator(mode="after")
+    def build_array(self) -> "PredictRequest":
+        """검증된 readings / readings_flat을 float32 배열로 한 번만 변환해 둡니다."""
+        if (self.readings is None) == (self.readings_flat is None):
+            raise ValueError("Exactly one of 'readings' or 'readings_flat' must be provided.")
+
+        expected_shape = (LSTM_SEQUENCE_LENGTH, len(READING_FIELDS))
+        if self.readings_flat is not None:
+            # 행 우선으로 펼친 입력은 reshape만으로 (L, F) C-contiguous 배열이 됨 (전치/복사 없음)
+            arr = np.asarray(self.readings_flat, dtype=np.float32)
+            if arr.size != LSTM_SEQUENCE_LENGTH * len(READING_FIELDS):
+                raise ValueError(
+                    f"Data integrity error: readings_flat must have exactly "
+                    f"{LSTM_SEQUENCE_LENGTH * len(READING_FIELDS)} values. Received {arr.size}."
+                )
+            self._array = arr.reshape(expected_shape)
+            return self
+
+        if isinstance(self.readings, np.ndarray):
+            # parse_list_rows에서 이미 변환/검사 완료
+            self._array = self.readings
+            return self
+
+        # 길이는 validate_sequence_length에서 검사했으므로 shape은 항상 expected_shape
+        self._array = np.array(list(map(_READING_GETTER, self.readings)), dtype=np.float32)
+        return self
+
+    def to_array(self) -> np.ndarray:
+        """(LSTM_SEQUENCE_LENGTH, len(READING_FIELDS)) float32 센서 값 배열을 반환합니다."""
+        return self._array
+
 # --- 4. API 응답 규격 ---
 class PredictResponse(BaseModel):
     """
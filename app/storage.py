@@ -1,37 +1,65 @@
 # app/storage.py
 
 import logging
-from datetime import datetime
-from typing import List, Dict, Any
-import pytz
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Any, List, Optional
 
-# 예측 결과를 저장할 최대 길이
-MAX_HISTORY: int = 30
+from dotenv import load_dotenv
 
-# 최근 예측 결과를 저장하는 전역 리스트
+load_dotenv()
+
+# 예측 결과를 저장할 최대 길이 (필요하면 .env 에 DASHBOARD_MAX_HISTORY 로 조절 가능)
+MAX_HISTORY: int = int(os.getenv("DASHBOARD_MAX_HISTORY", "30"))
+
+# 최근 예측 결과를 저장하는 전역 큐
+# maxlen을 넘으면 가장 오래된 데이터가 O(1)로 자동 제거됨 (메모리/대시보드 계산량 상한 보장)
 # 각 원소: {"timestamp": datetime, "prob_ng": float}
-PREDICTION_HISTORY: List[Dict[str, Any]] = []
+PREDICTION_HISTORY: Deque[Dict[str, Any]] = deque(maxlen=MAX_HISTORY)
+
+# 한국 표준시 (UTC+9, 서머타임 없음) – 호출마다 만들지 않도록 모듈 상수로 둠
+_KST = timezone(timedelta(hours=9), name="KST")
+
+# /predict의 BackgroundTasks(스레드풀)에서 기록하므로 쓰기/읽기 스냅샷을 Lock으로 보호
+_HISTORY_LOCK = threading.Lock()
 
 logging.info("[INFO] 전역 데이터 저장소 (storage.py) 초기화 완료.")
 
 
-def add_prediction_result(prob_ng: float) -> None:
+def add_prediction_result(prob_ng: float) -> Dict[str, Any]:
     """
-    새로운 예측 결과를 저장소에 추가하고 최대 길이를 유지합니다.
+    새로운 예측 결과를 저장소에 추가합니다. (최대 길이는 deque가 유지)
 
     Args:
         prob_ng: 모델이 반환한 불량 확률 (0.0 ~ 1.0)
-    """
-
-    # KST 시간대 객체 생성
-    KST = pytz.timezone('Asia/Seoul')
 
+    Returns:
+        저장된 레코드 ({"timestamp": datetime, "prob_ng": float})
+    """
     record = {
-        "timestamp": datetime.now(KST),  # 서버 현재 시각
+        "timestamp": datetime.now(_KST),  # 서버 현재 시각 (KST)
         "prob_ng": float(prob_ng),
     }
-    PREDICTION_HISTORY.append(record)
+    with _HISTORY_LOCK:
+        PREDICTION_HISTORY.append(record)
+    return record
 
-    # 최대 길이 초과 시 가장 오래된 데이터 제거 (FIFO 큐처럼 작동)
-    if len(PREDICTION_HISTORY) > MAX_HISTORY:
-        PREDICTION_HISTORY.pop(0)
+
+def get_history_snapshot() -> List[Dict[str, Any]]:
+    """
+    현재 히스토리의 복사본을 반환합니다.
+    여러 번 순회하는 도중 백그라운드 append로 길이가 바뀌지 않도록, 읽는 쪽은 이 스냅샷을 사용합니다.
+    """
+    with _HISTORY_LOCK:
+        return list(PREDICTION_HISTORY)
+
+
+def get_oldest_timestamp() -> Optional[datetime]:
+    """
+    히스토리에 남아 있는 가장 오래된 포인트의 시각 (없으면 None).
+    전체 스냅샷을 복사하지 않고 차트 시작 시각만 필요할 때 사용합니다.
+    """
+    with _HISTORY_LOCK:
+        return PREDICTION_HISTORY[0]["timestamp"] if PREDICTION_HISTORY else None
@@ -1,54 +1,130 @@
 import numpy as np
-import pandas as pd
-import time, os, json, requests
+import asyncio, atexit, hmac, threading, time, os, uuid, warnings
+from datetime import datetime, timezone
+import httpx
+import orjson
 import boto3
-from typing import List, Dict, Optional
+from botocore.config import Config
+from typing import List, Dict, Optional, Tuple
 from sklearn.preprocessing import MinMaxScaler
-from pandas.errors import EmptyDataError
 
 
-# S3 클라이언트 초기화 (전역으로 두면 성능 최적화)
-S3_CLIENT = boto3.client('s3')
+# S3 클라이언트 (첫 업로드 시 _s3()에서 1회 생성 후 재사용)
+# S3_LOG_BUCKET 미설정(로컬 개발 등) 시 boto3 세션 생성/자격 증명 탐색 비용을 들이지 않기 위함
+_S3_CLIENT = None
+_S3_CLIENT_LOCK = threading.Lock()
+_S3_CONFIG = Config(
+    tcp_keepalive=True,          # 배치 업로드 사이 유휴 커넥션 유지
+    max_pool_connections=10,
+    retries={"max_attempts": 2},
+)
+
+# Slack Webhook용 비동기 HTTP 클라이언트 (커넥션 풀 재사용, 서버 종료 시 close_http_client로 정리)
+_HTTPX = httpx.AsyncClient(timeout=5)
+
+# MinMaxScaler 정규화 계수 캐시 (init_scaler_cache로 서버 시작 시 1회 설정)
+_SCALE_F32: Optional[np.ndarray] = None
+_MIN_F32: Optional[np.ndarray] = None
+# 캐시를 만든 스케일러 객체 (다른 스케일러가 전달되면 캐시를 쓰지 않고 transform으로 처리)
+_CACHED_SCALER: Optional[MinMaxScaler] = None
+
+# S3 로그 배치 업로드 설정 (레코드 수 또는 경과 시간 중 먼저 도달하는 조건에서 업로드)
+LOG_FLUSH_MAX_RECORDS = int(os.getenv("S3_LOG_FLUSH_MAX_RECORDS", "100"))
+LOG_FLUSH_INTERVAL_SEC = float(os.getenv("S3_LOG_FLUSH_INTERVAL_SEC", "30"))
+
+# (bucket, prefix, source)별 NDJSON 레코드 버퍼 – BackgroundTasks 스레드에서 쓰므로 Lock으로 보호
+_LOG_BUFFERS: Dict[Tuple[str, str, str], List[bytes]] = {}
+_LOG_LOCK = threading.Lock()
+_LAST_FLUSH = time.monotonic()
+# 주기적 업로드 태스크 (start_s3_log_flusher로 서버 시작 시 생성, stop_s3_log_flusher로 종료)
+_FLUSH_TASK: Optional["asyncio.Task[None]"] = None
+
+# 디버그용: 1로 설정하면 캐시된 계수 대신 sklearn scaler.transform 경로로 정규화 (결과 비교용)
+USE_SKLEARN_TRANSFORM = os.getenv("USE_SKLEARN_TRANSFORM", "0") == "1"
 
 
 # ----------------------------------------------------------------------
 # A. 시퀀스 윈도우 변환 함수 (데이터 엔지니어링 핵심)
 # ----------------------------------------------------------------------
+def init_scaler_cache(scaler: MinMaxScaler) -> None:
+    """
+    [책임: 정규화 계수 캐시]
+    MinMaxScaler의 scale_/min_을 float32 배열로 미리 꺼내 둡니다.
+    이후 prepare_lstm_input은 sklearn transform(입력 검증 등 파이썬 오버헤드) 대신
+    동일한 affine 변환 X * scale_ + min_ 을 NumPy로 바로 계산합니다.
+    """
+    global _SCALE_F32, _MIN_F32, _CACHED_SCALER
+
+    # clip=True 스케일러는 결과 범위를 잘라야 하므로 캐시하지 않고 transform 사용
+    if getattr(scaler, "clip", False):
+        _SCALE_F32 = _MIN_F32 = _CACHED_SCALER = None
+        return
+
+    _SCALE_F32 = np.ascontiguousarray(scaler.scale_, dtype=np.float32)
+    _MIN_F32 = np.ascontiguousarray(scaler.min_, dtype=np.float32)
+    _CACHED_SCALER = scaler
+
+
 def prepare_lstm_input(
-    df_raw: pd.DataFrame, 
+    data_raw: np.ndarray, 
     scaler: MinMaxScaler, 
     sequence_length: int
 ) -> np.ndarray:
     """
     [책임: LSTM 입력 데이터 변환]
-    API 입력 데이터(DataFrame)를 정규화하고 LSTM 추론에 필요한 3D 시퀀스로 변환합니다.
+    API 입력 데이터(2D 배열)를 정규화하고 LSTM 추론에 필요한 3D 시퀀스로 변환합니다.
 
     Args:
-        df_raw: 추론에 사용될 특징 데이터 (Feature DataFrame).
+        data_raw: 추론에 사용될 특징 데이터 ((n_samples, n_features) 형태의 NumPy 배열).
         scaler: 훈련 시 사용된 MinMaxScaler 객체.
         sequence_length: LSTM 윈도우 크기.
 
     Returns:
-        (1, sequence_length, n_features) 형태의 3D NumPy 배열.
+        (1, sequence_length, n_features) 형태의 3D float32 NumPy 배열.
     """
-    # 1. 데이터 타입 유효성 검사 및 정규화
-    if df_raw.empty:
-        raise EmptyDataError("Input DataFrame is empty.")
-    
+    # 1. 데이터 타입 유효성 검사
+    if data_raw.size == 0:
+        raise ValueError("Input array is empty.")
+
+    # schemas.py에서 이미 길이 검사를 했으나, 내부 로직 안정성 확보
+    if data_raw.shape[0] < sequence_length:
+         raise ValueError(f"Insufficient data points ({data_raw.shape[0]}) for sequence length {sequence_length}.")
+
+    # 2. 마지막 윈도우만 먼저 잘라낸 뒤 정규화 (O(N*F) -> O(L*F))
+    window = data_raw[-sequence_length:]
+
     # 훈련 시와 동일한 방식으로 정규화 (성능 최적화)
+    # 캐시된 계수가 있으면 MinMaxScaler.transform과 같은 식을 NumPy로 직접 계산
     try:
-        data_scaled = scaler.transform(df_raw.values)
+        if scaler is _CACHED_SCALER and _SCALE_F32 is not None and not USE_SKLEARN_TRANSFORM:
+            if window.shape[1] != _SCALE_F32.shape[0]:
+                raise ValueError(
+                    f"X has {window.shape[1]} features, but MinMaxScaler is expecting {_SCALE_F32.shape[0]} features as input."
+                )
+            # (1, L, F) float32 C-contiguous 출력 버퍼를 한 번만 할당하고 곱셈/덧셈을 그 안에서 수행
+            # (중간 배열, astype, ascontiguousarray 복사 없음 / 요청마다 새 버퍼라 스레드풀 동시 호출에도 안전)
+            X_inference = np.empty((1, sequence_length, window.shape[1]), dtype=np.float32)
+            np.multiply(window, _SCALE_F32, out=X_inference[0])
+            np.add(X_inference[0], _MIN_F32, out=X_inference[0])
+            return X_inference
+
+        # scaler는 DataFrame으로 학습되어 feature_names_in_이 있으므로, ndarray를 넘기면 요청마다
+        # "X does not have valid feature names" 경고가 발생함 -> 컬럼 순서는 FEATURE_COLUMNS로 맞췄으니 무시
+        with warnings.catch_warnings():
+            warnings.filterwarnings(
+                "ignore", message="X does not have valid feature names", category=UserWarning
+            )
+            data_scaled = scaler.transform(window)
     except ValueError as e:
-        # 데이터프레임 컬럼 수 불일치 등의 오류 방지
+        # 입력 컬럼 수 불일치 등의 오류 방지
         raise ValueError(f"Normalization failed: Input features mismatch. Original error: {e}")
 
-    # 2. LSTM 시퀀스 윈도우 변환 (클린 코드: 로직 분리)
-    # schemas.py에서 이미 길이 검사를 했으나, 내부 로직 안정성 확보
-    if data_scaled.shape[0] < sequence_length:
-         raise ValueError(f"Insufficient data points ({data_scaled.shape[0]}) for sequence length {sequence_length}.")
-        
-    # 마지막 윈도우 만큼 슬라이싱하여 3D 형태로 변환
-    X_inference = data_scaled[-sequence_length:].reshape(1, sequence_length, data_scaled.shape[1])
+    # 3. LSTM 시퀀스 윈도우 변환 (클린 코드: 로직 분리) - 3D 형태로 변환
+    # 모델은 float32로 추론하므로 transform 경로(float64)도 여기서 float32로 맞춤 (이미 float32면 복사 없음)
+    X_inference = data_scaled.astype(np.float32, copy=False).reshape(1, sequence_length, data_scaled.shape[1])
+
+    # reshape 이후의 최종 버퍼를 C-contiguous로 보장 (추론 백엔드의 암묵적 복사 방지, 이미 연속이면 no-op)
+    X_inference = np.ascontiguousarray(X_inference, dtype=np.float32)
     
     return X_inference
 
@@ -56,25 +132,27 @@ def prepare_lstm_input(
 # ----------------------------------------------------------------------
 # B. API 인증 및 보안 함수 (MLOps 보안)
 # ----------------------------------------------------------------------
-def authenticate_api_key(received_key: Optional[str], expected_key: str) -> bool:
+def authenticate_api_key(received_key: Optional[str], expected_key: Optional[str]) -> bool:
     """
     API Key를 검증하여 인증 여부를 반환합니다.
     """
-    if not received_key:
+    # 서버 키가 설정되지 않은 경우(API_KEY 미설정)도 인증 실패로 처리
+    if not received_key or not expected_key:
         return False
         
-    # MLOps 보안: 환경 변수에서 로드된 키와 비교
-    return received_key == expected_key
+    # MLOps 보안: 환경 변수에서 로드된 키와 상수 시간 비교 (타이밍 공격 방지)
+    # 비ASCII 문자열도 비교할 수 있도록 bytes로 변환
+    return hmac.compare_digest(received_key.encode("utf-8"), expected_key.encode("utf-8"))
 
 
 # ----------------------------------------------------------------------
 # C. 알림 트리거 함수 (MLOps 자동화)
 # ----------------------------------------------------------------------
-def send_alert_notification(message: str, webhook_url: Optional[str]):
+async def send_alert_notification(message: str, webhook_url: Optional[str]):
     """
     [책임: 외부 알림 전송]
     Slack Webhook을 사용하여 불량 감지 경고 알림을 비동기적으로 전송합니다.
-    (실제 운영에서는 별도 비동기 작업 큐를 사용해야 성능에 영향이 없음)
+    /predict에서 BackgroundTasks로 등록되어 응답 전송 후 이벤트 루프에서 실행됩니다.
     """
     if not webhook_url:
         print("[WARNING] SLACK_WEBHOOK_URL is not set. Skipping notification.")
@@ -87,22 +165,30 @@ def send_alert_notification(message: str, webhook_url: Optional[str]):
     }
     
     try:
-        # 실제 운영에서는 requests 대신 asyncio/httpx를 사용하여 비동기로 처리해야 
-        # API 응답 속도(Latency)에 영향을 주지 않습니다. (성능 최적화 지점)
-        response = requests.post(webhook_url, json=payload, timeout=5) # 타임아웃 설정
+        # httpx 비동기 요청: 응답을 기다리는 동안 이벤트 루프를 막지 않음 (타임아웃 5초)
+        response = await _HTTPX.post(webhook_url, json=payload)
         response.raise_for_status() 
         print(f"[INFO] Slack alert sent successfully at {time.strftime('%H:%M:%S')}")
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print(f"[ERROR] Slack alert failed: Request timed out.")
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
         print(f"[ERROR] Failed to send Slack alert: {e}")
+    except Exception as e:
+        # 잘못된 SLACK_WEBHOOK_URL 등 예상하지 못한 오류도 여기서 막아야
+        # 뒤이어 등록된 BackgroundTasks(예측 로그 저장)가 중단되지 않음
+        print(f"[ERROR] Failed to send Slack alert: {e}")
+
+
+async def close_http_client() -> None:
+    """서버 종료 시 Slack용 httpx 클라이언트의 커넥션을 정리합니다."""
+    await _HTTPX.aclose()
 
 
 # ----------------------------------------------------------------------
 # D. 로깅 함수 (MLOps 모니터링) - 실제 구현 시 DynamoDB/S3 연동 필요
 # ----------------------------------------------------------------------
 def log_prediction_result(
-    input_data: List[Dict], 
+    input_data: np.ndarray, 
     prob_ng: float, 
     label: str, 
     version: str,
@@ -111,13 +197,11 @@ def log_prediction_result(
 ):
     """
     [책임: 예측 결과 로깅]
-    예측 결과를 로깅합니다. 실제 운영 환경에서는 DB/S3에 비동기 저장합니다.
+    예측 결과를 로깅합니다. /predict에서 BackgroundTasks로 등록되어
+    응답 전송 후 스레드풀에서 실행되므로 S3 업로드(boto3, 동기)가 응답 지연에 포함되지 않습니다.
     """
-    # [수정] pd.Timestamp.now() 사용을 위해 pandas 임포트 확인 (코드 최상단에서 처리)
-    import pandas as pd 
-    
     log_entry = {
-        "timestamp": pd.Timestamp.now().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),  # UTC, ms 단위
         "model_version": version,
         "prediction_probability": prob_ng,
         "prediction_label": label,
@@ -127,47 +211,137 @@ def log_prediction_result(
 
     # S3 저장 호출
     if s3_bucket:
-        log_data = { ... } # 위에서 생성한 최종 로그 데이터
-        save_log_to_s3(log_data, s3_bucket, s3_prefix, "inference")
+        save_log_to_s3(log_entry, s3_bucket, s3_prefix, "inference")
     
     # 현재는 단순 콘솔 출력 (실제 운영 시: Save to DynamoDB or S3)
-    print(f"[LOG] Prediction recorded: {json.dumps(log_entry)}")
+    print(f"[LOG] Prediction recorded: {orjson.dumps(log_entry).decode()}")
 
 
 # ----------------------------------------------------------------------
-# E. 예측 결과를 S3에 JSON 파일로 저장
+# E. 예측 결과를 S3에 NDJSON 파일로 배치 저장
 # ----------------------------------------------------------------------
+def _s3():
+    """S3 클라이언트를 처음 사용할 때 생성해 반환합니다. (스레드풀 동시 호출에서도 1개만 생성)"""
+    global _S3_CLIENT
+
+    client = _S3_CLIENT
+    if client is None:
+        with _S3_CLIENT_LOCK:
+            if _S3_CLIENT is None:
+                _S3_CLIENT = boto3.client('s3', config=_S3_CONFIG)
+            client = _S3_CLIENT
+    return client
+
+
 def save_log_to_s3(log_data: dict, bucket_name: str, prefix: str, source: str):
     """
-    예측 결과를 S3에 JSON 파일로 저장합니다. (비동기 처리 권장)
+    예측 결과를 메모리 버퍼에 모았다가 S3에 NDJSON 파일 하나로 저장합니다.
+    레코드가 S3_LOG_FLUSH_MAX_RECORDS개 쌓이거나 마지막 업로드 후 S3_LOG_FLUSH_INTERVAL_SEC초가 지나면 업로드하며,
+    새 레코드가 없어도 start_s3_log_flusher의 주기 태스크가 S3_LOG_FLUSH_INTERVAL_SEC마다 업로드합니다.
+    남은 레코드는 서버 종료 시(shutdown 이벤트/atexit) 업로드합니다.
     
     Args:
         log_data: 저장할 로그 데이터 딕셔너리.
         bucket_name: 대상 S3 버킷 이름.
         prefix: 버킷 내 저장 경로 접두사 (예: logs/yyyy/mm/dd/).
+        source: 로그 출처 (파일 이름 접두사로 사용).
     """
+    global _LAST_FLUSH
+
+    # 1. JSON 직렬화 (orjson은 UTF-8 bytes를 바로 반환) - 한 줄에 레코드 하나 (NDJSON)
+    line = orjson.dumps(log_data) + b"\n"
+
+    # 2. 버퍼에 추가하고, 조건을 만족하면 버퍼를 통째로 떼어냄 (업로드는 Lock 밖에서)
+    target = (bucket_name, prefix, source)
+    with _LOG_LOCK:
+        _LOG_BUFFERS.setdefault(target, []).append(line)
+        if (
+            len(_LOG_BUFFERS[target]) < LOG_FLUSH_MAX_RECORDS
+            and time.monotonic() - _LAST_FLUSH < LOG_FLUSH_INTERVAL_SEC
+        ):
+            return
+        batches = list(_LOG_BUFFERS.items())
+        _LOG_BUFFERS.clear()
+        _LAST_FLUSH = time.monotonic()
+
+    # 3. S3에 업로드
+    for (bucket, pfx, src), lines in batches:
+        _put_log_batch(lines, bucket, pfx, src)
+
+
+def flush_s3_logs() -> None:
+    """버퍼에 남은 로그를 모두 S3에 업로드합니다. (주기 업로드 태스크, 서버 종료 시 shutdown 이벤트/atexit로 호출)"""
+    global _LAST_FLUSH
+
+    with _LOG_LOCK:
+        batches = list(_LOG_BUFFERS.items())
+        _LOG_BUFFERS.clear()
+        _LAST_FLUSH = time.monotonic()
+
+    for (bucket, pfx, src), lines in batches:
+        _put_log_batch(lines, bucket, pfx, src)
+
+
+async def _flush_s3_logs_periodically() -> None:
+    """마지막 업로드 후 S3_LOG_FLUSH_INTERVAL_SEC초가 지날 때마다 버퍼를 업로드합니다."""
+    while True:
+        delay = LOG_FLUSH_INTERVAL_SEC - (time.monotonic() - _LAST_FLUSH)
+        if delay > 0:
+            # 레코드 수 조건 등으로 그 사이에 업로드됐으면 다음 주기까지 다시 대기
+            await asyncio.sleep(delay)
+            continue
+        # boto3 업로드는 블로킹이므로 이벤트 루프 밖(스레드)에서 실행
+        await asyncio.to_thread(flush_s3_logs)
+
+
+def start_s3_log_flusher() -> None:
+    """
+    주기적 S3 로그 업로드 태스크를 시작합니다. (FastAPI startup 이벤트에서 호출)
+    요청이 끊겨도 버퍼에 남은 로그가 S3_LOG_FLUSH_INTERVAL_SEC 이상 머물지 않도록 합니다.
+    """
+    global _FLUSH_TASK
+    if _FLUSH_TASK is None or _FLUSH_TASK.done():
+        _FLUSH_TASK = asyncio.get_running_loop().create_task(_flush_s3_logs_periodically())
+
+
+async def stop_s3_log_flusher() -> None:
+    """주기적 업로드 태스크를 종료합니다. (FastAPI shutdown 이벤트에서 flush_s3_logs 전에 호출)"""
+    global _FLUSH_TASK
+    task, _FLUSH_TASK = _FLUSH_TASK, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def _put_log_batch(lines: List[bytes], bucket_name: str, prefix: str, source: str) -> None:
+    """버퍼링된 NDJSON 레코드들을 S3 객체 하나로 업로드합니다."""
     # 1. 파일 이름 및 경로 정의 (데이터 엔지니어링 표준)
-    # yyyy/mm/dd/source/timestamp.json 형태로 저장하여 Athena 분석 용이하게 함
-    current_time = pd.Timestamp.now()
-    timestamp_str = current_time.strftime("%Y%m%d%H%M%S")
-    
+    # yyyy/mm/dd/source/timestamp.ndjson 형태로 저장하여 Athena 분석 용이하게 함
+    # 파티션(year=/month=/day=)은 기존 Athena 테이블과 맞추기 위해 0 채움 없이 유지,
+    # 같은 초 안의 업로드 충돌은 uuid4 접미사로 방지
+    current_time = datetime.now()
     s3_key = (
         f"{prefix}/year={current_time.year}/month={current_time.month}/day={current_time.day}/"
-        f"{source}_{timestamp_str}_{int(time.time()*1000)}.json"
+        f"{source}_{current_time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}.ndjson"
     )
     
-    # 2. JSON 직렬화
-    json_data = json.dumps(log_data).encode('UTF-8')
-    
-    # 3. S3에 업로드
+    # 2. S3에 업로드
     try:
-        S3_CLIENT.put_object(
+        _s3().put_object(
             Bucket=bucket_name,
             Key=s3_key,
-            Body=json_data,
-            ContentType='application/json'
+            Body=b"".join(lines),
+            ContentType='application/x-ndjson'
         )
-        print(f"[INFO] Log saved to S3: s3://{bucket_name}/{s3_key}")
+        print(f"[INFO] {len(lines)} logs saved to S3: s3://{bucket_name}/{s3_key}")
     except Exception as e:
         # S3 오류 발생 시 서버 다운을 막기 위해 예외 처리
-        print(f"[ERROR] Failed to save log to S3: {e}")
\ No newline at end of file
+        print(f"[ERROR] Failed to save logs to S3: {e}")
+
+
+# 프로세스 종료 시 버퍼에 남은 로그 업로드 (FastAPI shutdown 이벤트에서도 호출, 이미 비어 있으면 no-op)
+atexit.register(flush_s3_logs)
@@ -0,0 +1,68 @@
+# convert_tflite.py
+"""
+학습된 Keras LSTM 모델을 CPU 서빙용 TFLite 모델로 변환하는 오프라인 스크립트.
+
+- app.inference.build_serving_function과 같은 고정 입력 signature
+  (1, LSTM_SEQUENCE_LENGTH, n_features) float32 그래프를 변환
+- dynamic range quantization (가중치 int8, 입출력 float32 -> 서버 코드 변경 없음)
+  (representative dataset 기반 full int8 양자화는 TF 2.20 calibrator가 이 LSTM 모델에서
+   segfault로 종료되어 지원하지 않음)
+
+변환 후 서버 실행 시 INFERENCE_BACKEND=tflite 로 설정하면 TFLite 모델을 사용한다.
+
+사용 예
+------------
+python convert_tflite.py
+python convert_tflite.py --output model/best_model.tflite
+"""
+
+import argparse
+import logging
+
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+from app.inference import build_serving_function
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[CONVERT] %(asctime)s %(levelname)s: %(message)s",
+)
+
+
+def convert(model_path: str, output_path: str) -> None:
+    model = keras.models.load_model(model_path, compile=False)
+    serve = build_serving_function(model)
+
+    # 가중치를 상수로 고정한 그래프를 변환
+    # (변수를 그대로 두면 LSTM while 루프 안의 READ_VARIABLE이 남아 invoke 시 실패함)
+    frozen = convert_variables_to_constants_v2(serve.get_concrete_function())
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([frozen], model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    # 서버의 LiteRT(ai_edge_litert) 런타임에는 TF 연산(Flex) delegate가 없으므로 내장 연산만 허용
+    # (지원되지 않는 연산이 있으면 실행 불가능한 모델을 만드는 대신 변환 단계에서 실패)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+
+    tflite_model = converter.convert()
+    with open(output_path, "wb") as f:
+        f.write(tflite_model)
+
+    logging.info(
+        f"Converted {model_path} -> {output_path} "
+        f"({len(tflite_model) / 1024:.1f} KB)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keras LSTM -> TFLite 변환")
+    parser.add_argument("--model", default="model/best_model.keras")
+    parser.add_argument("--output", default="model/best_model.tflite")
+    args = parser.parse_args()
+
+    convert(args.model, args.output)
+
+
+if __name__ == "__main__":
+    main()
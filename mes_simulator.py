@@ -18,13 +18,15 @@ VERIFY_SSL         : HTTPS 인증서 검증 여부(true/false). 기본 true
 
 import os
 import time
-import json
 import logging
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
+import numpy as np
+import orjson
 import pandas as pd
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 
 # -----------------------------
@@ -44,6 +46,21 @@ PREDICT_ENDPOINT = f"{API_BASE_URL}/predict"
 # LSTM 시퀀스 길이 (schemas.py와 동일하게 10으로 가정)
 SEQUENCE_LENGTH = 10
 
+# schemas.READING_FIELDS 순서 (readings_flat 행 내부 순서)
+_COLS = ("MELT_TEMP", "MOTORSPEED", "MELT_WEIGHT", "INSP")
+
+# 요청마다 TCP/TLS 연결을 새로 맺지 않도록 keep-alive 세션 1개를 재사용
+# (ALB HTTPS 엔드포인트에서는 매 요청 TLS handshake 비용이 큼)
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "Content-Type": "application/json",
+    "x-api-key": API_KEY,
+})
+_SESSION.verify = VERIFY_SSL
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 
 # -----------------------------
 # 2. 로깅 설정
@@ -66,15 +83,17 @@ def load_csv_data(path: str) -> pd.DataFrame:
     if not os.path.exists(path):
         raise FileNotFoundError(f"CSV not found: {path}")
 
-    df = pd.read_csv(path)
-
-    required_cols = ["MELT_TEMP", "MOTORSPEED", "MELT_WEIGHT", "INSP"]
-    missing = [c for c in required_cols if c not in df.columns]
+    # 헤더만 읽어 필수 컬럼 존재 여부를 먼저 검사 (값 변환 오류와 구분하기 위함)
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [c for c in _COLS if c not in header]
     if missing:
         raise ValueError(f"CSV is missing required columns: {missing}")
 
-    # 필요한 컬럼만 사용 (TAG 등은 있으면 무시)
-    df = df[required_cols].copy()
+    # 필요한 컬럼만 파싱 (TAG 등은 읽지 않음, 이후 컬럼 선택/copy 불필요)
+    # dtype은 float64 유지: float32로 읽으면 JSON payload에 반올림 오차(3.19 -> 3.190000057...)가 생김
+    # (숫자가 아닌 값이 있으면 pandas의 변환 오류 ValueError가 그대로 전달됨)
+    df = pd.read_csv(path, usecols=list(_COLS), dtype=np.float64, engine="c")
+
     logging.info(f"Loaded CSV: {path}, rows={len(df)}, cols={df.columns.tolist()}")
     return df
 
@@ -85,42 +104,30 @@ def load_csv_data(path: str) -> pd.DataFrame:
 def build_payload(window: pd.DataFrame) -> Dict:
     """
     10개 시퀀스를 읽어서 FastAPI /predict 요청 형식으로 변환.
-    schemas.PredictRequest(readings: List[Reading]) 구조를 따름.
+    schemas.PredictRequest(readings_flat: List[float]) 구조를 따름:
+    _COLS 순서의 행을 시간 순으로 이어 붙인 40개 숫자 (서버는 reshape만으로 (10, 4) 배열 생성).
     """
-    readings: List[Dict] = []
-    for _, row in window.iterrows():
-        readings.append(
-            {
-                "MELT_TEMP": float(row["MELT_TEMP"]),
-                "MOTORSPEED": float(row["MOTORSPEED"]),
-                "MELT_WEIGHT": float(row["MELT_WEIGHT"]),
-                "INSP": float(row["INSP"]),
-            }
-        )
-
-    return {"readings": readings}
+    # 행마다 dict를 만들지 않고, 한 번에 NumPy 배열로 바꾼 뒤 행 우선(C order)으로 펼침
+    # (tolist()가 np.float64 -> Python float 변환까지 처리)
+    arr = window[list(_COLS)].to_numpy(dtype=np.float64)
+    return {"readings_flat": arr.ravel(order="C").tolist()}
 
 
 # -----------------------------
 # 5. API 호출 함수
 # -----------------------------
-def call_predict_api(payload: Dict) -> None:
+def call_predict_api(payload_bytes: bytes) -> None:
     """
     /predict API를 호출하고 결과를 로그로 남긴다.
+    payload_bytes는 미리 직렬화해 둔 JSON 본문 (요청마다 다시 직렬화하지 않음).
     인증 실패/서버 오류 등은 재시도 없이 로그만 출력.
     """
-    headers = {
-        "Content-Type": "application/json",
-        "x-api-key": API_KEY,
-    }
-
     try:
-        resp = requests.post(
+        # 헤더/SSL 검증 설정은 _SESSION에 이미 포함
+        resp = _SESSION.post(
             PREDICT_ENDPOINT,
-            headers=headers,
-            data=json.dumps(payload),
+            data=payload_bytes,
             timeout=10,
-            verify=VERIFY_SSL,
         )
     except requests.RequestException as e:
         logging.error(f"Request failed: {e}")
@@ -131,7 +138,7 @@ def call_predict_api(payload: Dict) -> None:
         return
 
     try:
-        data = resp.json()
+        data = orjson.loads(resp.content)
     except ValueError:
         logging.error(f"Invalid JSON response: {resp.text[:200]}")
         return
@@ -146,7 +153,26 @@ def call_predict_api(payload: Dict) -> None:
 
 
 # -----------------------------
-# 6. 메인 루프
+# 6. 전송할 payload 사전 생성
+# -----------------------------
+def build_all_payloads(df: pd.DataFrame) -> List[Tuple[int, bytes]]:
+    """
+    CSV는 고정이고 윈도우도 겹치지 않으므로, 모든 윈도우의 JSON 본문을 시작 시 1회만 만든다.
+    반환값: (윈도우 시작 행 번호, 직렬화된 JSON bytes) 리스트
+    마지막 윈도우가 10개 미만이면 버린다.
+    """
+    n_windows = len(df) // SEQUENCE_LENGTH
+    payloads: List[Tuple[int, bytes]] = []
+    for i in range(n_windows):
+        start_idx = i * SEQUENCE_LENGTH
+        window = df.iloc[start_idx:start_idx + SEQUENCE_LENGTH]
+        # orjson은 bytes를 바로 반환 (json.dumps + encode 대비 빠름)
+        payloads.append((start_idx, orjson.dumps(build_payload(window))))
+    return payloads
+
+
+# -----------------------------
+# 7. 메인 루프
 # -----------------------------
 def main():
     if not API_KEY:
@@ -163,28 +189,24 @@ def main():
             f"{SEQUENCE_LENGTH}."
         )
 
+    # 10개씩 끊어서(non-overlapping) 미리 직렬화 -> 루프에서는 캐시된 bytes만 전송
+    payloads = build_all_payloads(df)
+
     logging.info(
         f"Start MES simulation: base_url={API_BASE_URL}, "
-        f"interval={SIM_INTERVAL_SEC}s, rows={len(df)}, window={SEQUENCE_LENGTH}"
+        f"interval={SIM_INTERVAL_SEC}s, rows={len(df)}, window={SEQUENCE_LENGTH}, "
+        f"windows={len(payloads)}"
     )
 
     while True:
-        # 10개씩 끊어서(non-overlapping) 전송
         # MES에서 30초마다 10개 패킷을 보내는 구조라고 가정
-        for start_idx in range(0, len(df), SEQUENCE_LENGTH):
+        for start_idx, payload_bytes in payloads:
             end_idx = start_idx + SEQUENCE_LENGTH
-            window = df.iloc[start_idx:end_idx]
-
-            # 마지막 윈도우가 10개 미만이면 버려도 되고, 다음 loop에서 다시 처음부터 시작
-            if len(window) < SEQUENCE_LENGTH:
-                break
-
-            payload = build_payload(window)
             logging.info(
                 f"Sending window rows [{start_idx}:{end_idx}) "
                 f"to {PREDICT_ENDPOINT}"
             )
-            call_predict_api(payload)
+            call_predict_api(payload_bytes)
 
             logging.info(f"Sleep {SIM_INTERVAL_SEC} seconds...\n")
             time.sleep(SIM_INTERVAL_SEC)
@@ -0,0 +1,135 @@
+# tests/test_dashboard.py
+"""
+대시보드 차트 다운샘플링(LTTB) 동작과 /dashboard/data 응답(전체/304/since) 확인.
+기본 MAX_HISTORY(30)에서는 다운샘플링이 실행되지 않으므로 함수를 직접 호출해서 검사한다.
+API 테스트는 모델 로딩이 필요한 app.main 대신 대시보드 라우터만 붙인 앱을 사용한다.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import dashboard
+from app.dashboard import _lttb_indices
+
+
+def test_lttb_returns_all_indices_when_n_out_is_large_enough():
+    x = np.arange(10, dtype=np.float64)
+    y = np.random.default_rng(0).random(10)
+
+    np.testing.assert_array_equal(_lttb_indices(x, y, 10), np.arange(10))
+    np.testing.assert_array_equal(_lttb_indices(x, y, 50), np.arange(10))
+
+
+def test_lttb_keeps_endpoints_order_and_peaks():
+    n, n_out = 1000, 100
+    x = np.arange(n, dtype=np.float64)
+    y = np.zeros(n)
+    # 평평한 구간 가운데의 단일 피크(NG 스파이크)는 다운샘플링 후에도 남아야 함
+    y[437] = 100.0
+    y[812] = -50.0
+
+    idx = _lttb_indices(x, y, n_out)
+
+    assert len(idx) == n_out
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0)
+    assert 437 in idx and 812 in idx
+
+
+def test_downsampled_chart_keeps_recent_points_raw(monkeypatch):
+    monkeypatch.setattr(dashboard, "DOWNSAMPLE_THRESHOLD", 100)
+    monkeypatch.setattr(dashboard, "DOWNSAMPLE_N_OUT", 50)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    history = [
+        {"timestamp": base + timedelta(seconds=i), "prob_ng": (i % 7) / 7}
+        for i in range(300)
+    ]
+
+    metrics = dashboard._build_dashboard_metrics(history)
+    timestamps = metrics["timestamps"]
+
+    assert len(timestamps) == 50
+    assert timestamps == sorted(timestamps)
+    assert timestamps[0] == metrics["range_start"]
+    # 최근 DOWNSAMPLE_KEEP_RAW개는 원본 그대로
+    keep = dashboard.DOWNSAMPLE_KEEP_RAW
+    expected_tail = [dashboard._to_epoch_ms(rec["timestamp"]) for rec in history[-keep:]]
+    assert timestamps[-keep:] == expected_tail
+
+
+@pytest.fixture
+def client_with_history(monkeypatch):
+    """라우터만 붙인 앱 + 고정 히스토리 12개 (마지막 3개 NG)."""
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    probs = [0.1] * 9 + [0.9] * 3
+    history = [
+        {"timestamp": base + timedelta(seconds=i), "prob_ng": p}
+        for i, p in enumerate(probs)
+    ]
+    monkeypatch.setattr(dashboard, "get_history_snapshot", lambda: list(history))
+    dashboard._METRICS_CACHE.clear()
+
+    app = FastAPI()
+    app.include_router(dashboard.router)
+    yield TestClient(app), history
+    dashboard._METRICS_CACHE.clear()
+
+
+def test_dashboard_data_full_response(client_with_history):
+    client, history = client_with_history
+
+    res = client.get("/dashboard/data")
+
+    assert res.status_code == 200
+    assert res.headers["etag"]
+    assert res.headers["cache-control"] == "no-cache"
+    body = res.json()
+    assert body["has_data"] is True
+    assert body["incremental"] is False
+    expected_ts = [dashboard._to_epoch_ms(rec["timestamp"]) for rec in history]
+    assert body["timestamps"] == expected_ts
+    assert body["range_start"] == expected_ts[0]
+    assert body["prob_ng_percent"] == pytest.approx([rec["prob_ng"] * 100 for rec in history])
+    assert body["last"] == {
+        "prob_percent": pytest.approx(90.0),
+        "status_label": "NG",
+        "timestamp": expected_ts[-1],
+    }
+    assert body["recent"]["window"] == dashboard.RECENT_WINDOW_DEFAULT
+    assert body["recent"]["ng_count_recent"] == 3
+    assert body["streak_ng"] == {"streak_n": dashboard.STREAK_N, "is_streak": True}
+
+
+def test_dashboard_data_returns_304_for_matching_etag(client_with_history):
+    client, _ = client_with_history
+    etag = client.get("/dashboard/data").headers["etag"]
+
+    res = client.get("/dashboard/data", headers={"If-None-Match": etag})
+
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["etag"] == etag
+
+
+def test_dashboard_data_since_last_timestamp_keeps_kpis(client_with_history):
+    client, history = client_with_history
+    last_ts = dashboard._to_epoch_ms(history[-1]["timestamp"])
+    full_etag = client.get("/dashboard/data").headers["etag"]
+
+    res = client.get("/dashboard/data", params={"since": last_ts})
+
+    assert res.status_code == 200
+    # since가 다르면 ETag도 달라야 함 (전체 응답의 ETag로 304가 나면 안 됨)
+    assert res.headers["etag"] != full_etag
+    body = res.json()
+    assert body["incremental"] is True
+    assert body["timestamps"] == []
+    assert body["prob_ng_percent"] == []
+    assert body["marker_colors"] == []
+    assert body["last"]["timestamp"] == last_ts
+    assert body["last"]["status_label"] == "NG"
+    assert body["recent"]["ng_count_recent"] == 3
+    assert body["streak_ng"]["is_streak"] is True
@@ -0,0 +1,89 @@
+# tests/test_schemas.py
+"""
+PredictRequest 입력 형식(readings_flat / Reading 리스트 / 숫자 리스트의 리스트) 확인.
+세 형식이 같은 배열을 만드는지, 잘못된 요청이 422로 거절되는지 검사한다.
+422 검사는 모델 로딩이 필요한 app.main 대신 PredictRequest만 받는 앱을 사용한다.
+"""
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.schemas import LSTM_SEQUENCE_LENGTH, READING_FIELDS, PredictRequest
+
+EXPECTED = (
+    np.arange(LSTM_SEQUENCE_LENGTH * len(READING_FIELDS), dtype=np.float32)
+    .reshape(LSTM_SEQUENCE_LENGTH, len(READING_FIELDS))
+    + 0.5
+)
+
+FLAT = EXPECTED.ravel(order="C").tolist()
+ROWS = EXPECTED.tolist()
+DICTS = [dict(zip(READING_FIELDS, row)) for row in ROWS]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.post("/validate")
+    def validate(req: PredictRequest):
+        return {"shape": list(req.to_array().shape)}
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"readings_flat": FLAT}, {"readings": DICTS}, {"readings": ROWS}],
+    ids=["flat", "dict", "list"],
+)
+def test_payload_forms_build_same_array(payload):
+    arr = PredictRequest(**payload).to_array()
+
+    assert arr.dtype == np.float32
+    assert arr.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(arr, EXPECTED)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"readings_flat": FLAT}, {"readings": DICTS}, {"readings": ROWS}],
+    ids=["flat", "dict", "list"],
+)
+def test_valid_payloads_are_accepted(client, payload):
+    res = client.post("/validate", json=payload)
+
+    assert res.status_code == 200
+    assert res.json() == {"shape": [LSTM_SEQUENCE_LENGTH, len(READING_FIELDS)]}
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"readings": ROWS, "readings_flat": FLAT},
+        {"readings": DICTS, "readings_flat": FLAT},
+        {},
+        {"readings_flat": FLAT[:-1]},
+        {"readings": ROWS[:-1]},
+        {"readings": DICTS[:-1]},
+        {"readings": [row[:-1] for row in ROWS]},
+        {"readings": ROWS[:-1] + [ROWS[-1][:-1]]},
+        {"readings": [[None] + row[1:] for row in ROWS]},
+    ],
+    ids=[
+        "both-list",
+        "both-dict",
+        "neither",
+        "flat-wrong-count",
+        "list-wrong-count",
+        "dict-wrong-count",
+        "list-wrong-width",
+        "list-ragged",
+        "list-null",
+    ],
+)
+def test_invalid_payloads_return_422(client, payload):
+    res = client.post("/validate", json=payload)
+
+    assert res.status_code == 422